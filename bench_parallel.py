@@ -0,0 +1,59 @@
+"""并行批量求解的扩展性测试：python bench_parallel.py [数据库路径] [放大倍数] [条件组数]"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+from parallel_search import solve_many
+
+
+def load_players(path, scale):
+    """读取数据库并按倍数复制，模拟更大的球员表"""
+    df = pd.read_excel(path)
+    df = df.rename(columns={'球员': '姓名', '背号': '号码', '俱乐部': '球队'})
+    df['号码'] = pd.to_numeric(df['号码'], errors='coerce')
+    return pd.concat([df] * scale, ignore_index=True)
+
+
+def random_conditions(df, count, seed=0):
+    """随机生成与 parse_input 输出格式相同的条件组"""
+    rng = random.Random(seed)
+    nationalities = df['国籍'].dropna().astype(str).unique().tolist()
+    clubs = df['球队'].dropna().astype(str).unique().tolist()
+    conditions_list = []
+    for _ in range(count):
+        conditions = [
+            {'field': '国籍', 'value': rng.choice(nationalities), 'type': 'contain'},
+            {'field': '身高', 'value': rng.randint(165, 195), 'type': 'close'},
+        ]
+        if rng.random() < 0.5:
+            conditions.append({'field': '球队', 'value': rng.choice(clubs), 'type': 'contain'})
+        else:
+            start = rng.randint(1, 30)
+            conditions.append({'field': '号码', 'value': (start, start + 10), 'type': 'range'})
+        conditions_list.append(conditions)
+    return conditions_list
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "况两把.xlsx"
+    scale = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    queries = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    df = load_players(path, scale)
+    conditions_list = random_conditions(df, queries)
+    print(f"球员数: {len(df)}  条件组数: {queries}")
+
+    baseline = None
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        solve_many(df, conditions_list, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>2} 进程: {elapsed:7.3f}s  加速比 {baseline / elapsed:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
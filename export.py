@@ -0,0 +1,95 @@
+import json
+import os
+
+# 每次写入的行数
+CHUNK_SIZE = 10000
+
+EXPORT_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.xlsx': 'xlsx',
+}
+
+
+def format_from_path(path):
+    """根据扩展名判断导出格式"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式：{ext or '无扩展名'}（支持 csv / jsonl / xlsx）")
+    return EXPORT_FORMATS[ext]
+
+
+def iter_chunks(df, chunk_size=CHUNK_SIZE):
+    """按块切分结果表"""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def iter_batch_chunks(batch_results, chunk_size=CHUNK_SIZE):
+    """批量求解结果按块输出，首列为对应的线索"""
+    for clue, result in batch_results:
+        for chunk in iter_chunks(result, chunk_size):
+            chunk = chunk.copy()
+            chunk.insert(0, '线索', clue)
+            yield chunk
+
+
+def _native_rows(chunk):
+    """转换为 Python 原生值的行，空值为 None"""
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def _write_csv(chunks, path, progress):
+    written = 0
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=(i == 0))
+            written += len(chunk)
+            progress(written)
+    return written
+
+
+def _write_jsonl(chunks, path, progress):
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            for row in _native_rows(chunk):
+                record = dict(zip(chunk.columns, row))
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            written += len(chunk)
+            progress(written)
+    return written
+
+
+def _write_xlsx(chunks, path, progress):
+    from openpyxl import Workbook
+
+    # 只写模式：行直接写入临时文件，不在内存中保留整个工作表
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("球员")
+    written = 0
+    header_written = False
+    for chunk in chunks:
+        if not header_written:
+            sheet.append(list(chunk.columns))
+            header_written = True
+        for row in _native_rows(chunk):
+            sheet.append(list(row))
+        written += len(chunk)
+        progress(written)
+    workbook.save(path)
+    return written
+
+
+WRITERS = {
+    'csv': _write_csv,
+    'jsonl': _write_jsonl,
+    'xlsx': _write_xlsx,
+}
+
+
+def export_chunks(chunks, path, progress=None):
+    """将分块的结果流式写入文件，返回写入的行数"""
+    writer = WRITERS[format_from_path(path)]
+    return writer(chunks, path, progress or (lambda written: None))
@@ -1,8 +1,15 @@
 import pandas as pd
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog, simpledialog
 import re
 import os
+import threading
+
+from parallel_search import solve_many
+from storage import open_backend, REQUIRED_COLUMNS
+from export import export_chunks, iter_chunks, iter_batch_chunks
+from history import SearchStore, restore_conditions
+from sorting import SortCache
 
 class PlayerSearcherGUI:
     def __init__(self, root):
@@ -11,8 +18,24 @@ class PlayerSearcherGUI:
         self.root.geometry("1300x900")
         
         # 初始化数据
-        self.df = None
+        self.backend = None
+        self.current_result = None
+        self.exporting = False
+        self.search_store = None
+        self.history_window = None
+        self.sort_cache = None
+        # 批量求解使用的内存副本：(数据版本, DataFrame)，每次加载数据后只读取一次
+        self.snapshot = None
+        self.snapshot_lock = threading.Lock()
+        # 批量求解结果及其数据版本（结果的行号只在该版本下有效）
+        self.batch_tree = None
+        self.batch_results = []
+        self.batch_version = None
+        self.sort_column = None
+        self.sort_descending = False
         self.excel_file = r"D:\vscode\learn\kuangyiba\况两把.xlsx"
+        # 存储后端：'sqlite'（首次导入后走索引查询）或 'dataframe'（全部载入内存）
+        self.storage = "sqlite"
         
         # 设置样式
         self.setup_styles()
@@ -35,56 +58,67 @@ class PlayerSearcherGUI:
                 messagebox.showerror("错误", f"找不到数据库文件：{self.excel_file}")
                 return
             
-            self.df = pd.read_excel(self.excel_file)
-            
-            # 重命名列名，使更符合习惯
-            column_mapping = {
-                '球员': '姓名',
-                '背号': '号码',
-                '俱乐部': '球队',
-                '惯用脚': '惯用脚'
-            }
-            self.df = self.df.rename(columns=column_mapping)
+            if self.backend is not None:
+                self.backend.close()
+            self.backend = open_backend(self.excel_file, self.storage)
+            # 排序排列按数据加载缓存，重新加载后重新计算
+            self.sort_cache = SortCache(self.backend)
+            self.current_result = None
+            if self.batch_version != self.backend.data_version:
+                self.clear_batch_results()
             
             # 确保所有列都存在
-            required_columns = ['姓名', '位置', '类型', '号码', '球队', '国籍', '身高', '惯用脚']
-            for col in required_columns:
-                if col not in self.df.columns:
+            for col in REQUIRED_COLUMNS:
+                if col not in self.backend.columns:
                     messagebox.showwarning("警告", f"数据库缺少列：{col}")
             
-            # 将号码列转换为数值类型（处理可能的NaN值）
-            if '号码' in self.df.columns:
-                self.df['号码'] = pd.to_numeric(self.df['号码'], errors='coerce')
-            
             self.status_label.config(
-                text=f"✓ 数据加载成功！共 {len(self.df)} 名球员", 
+                text=f"✓ 数据加载成功！共 {len(self.backend)} 名球员", 
                 foreground="green"
             )
             
             self.update_fields_list()
             self.update_quick_conditions()
             
+            # 加载查询历史，数据版本变化的记录在后台重新计算；历史出错不影响已加载的数据
+            history_file = os.path.splitext(self.excel_file)[0] + '_history.json'
+            try:
+                self.search_store = SearchStore(history_file)
+                self.refresh_stale_searches()
+            except Exception as e:
+                self.history_save_failed(e)
+            self.update_history_window()
+            
         except Exception as e:
-            self.df = pd.DataFrame()
+            if self.backend is not None:
+                self.backend.close()
+            self.backend = None
+            self.sort_cache = None
+            self.current_result = None
+            self.clear_batch_results()
             self.status_label.config(
                 text=f"✗ 数据加载失败: {str(e)}", 
                 foreground="red"
             )
             messagebox.showerror("错误", f"加载数据时出错：{str(e)}")
     
+    def has_data(self):
+        """是否已成功加载球员数据"""
+        return self.backend is not None and len(self.backend) > 0
+    
     def update_fields_list(self):
         """更新数据库字段列表"""
-        if not self.df.empty:
-            fields = list(self.df.columns)
+        if self.has_data():
+            fields = list(self.backend.columns)
             self.fields_listbox.delete(0, tk.END)
             for field in fields:
                 self.fields_listbox.insert(tk.END, field)
     
     def update_quick_conditions(self):
         """根据数据更新快速条件"""
-        if not self.df.empty:
+        if self.has_data():
             # 获取热门国籍
-            top_nationalities = self.df['国籍'].value_counts().head(10).index.tolist()
+            top_nationalities = self.backend.top_values('国籍', 10)
             
             # 更新国籍按钮
             for i, nationality in enumerate(top_nationalities):
@@ -95,7 +129,7 @@ class PlayerSearcherGUI:
                     )
             
             # 获取热门球队
-            top_clubs = self.df['球队'].value_counts().head(8).index.tolist()
+            top_clubs = self.backend.top_values('球队', 8)
             
             # 更新球队按钮
             for i, club in enumerate(top_clubs):
@@ -144,6 +178,22 @@ class PlayerSearcherGUI:
         )
         refresh_btn.pack(side=tk.RIGHT)
         
+        batch_btn = ttk.Button(
+            title_frame, 
+            text="批量求解", 
+            command=self.open_batch_window,
+            width=10
+        )
+        batch_btn.pack(side=tk.RIGHT, padx=(0, 5))
+        
+        history_btn = ttk.Button(
+            title_frame, 
+            text="历史/收藏", 
+            command=self.open_history_window,
+            width=10
+        )
+        history_btn.pack(side=tk.RIGHT, padx=(0, 5))
+        
         # 左侧面板
         left_panel = ttk.Frame(main_frame)
         left_panel.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(0, 10))
@@ -318,6 +368,14 @@ class PlayerSearcherGUI:
         )
         self.conditions_label.pack(side=tk.LEFT, padx=(20, 0))
         
+        self.export_btn = ttk.Button(
+            stats_frame, 
+            text="导出结果", 
+            command=self.export_current_result,
+            width=10
+        )
+        self.export_btn.pack(side=tk.RIGHT)
+        
         # 结果表格
         columns = ("姓名", "国籍", "球队", "位置", "身高", "号码", "类型", "惯用脚")
         
@@ -336,8 +394,9 @@ class PlayerSearcherGUI:
         
         column_widths = {"姓名": 100, "国籍": 80, "球队": 120, "位置": 60, 
                         "身高": 60, "号码": 60, "类型": 60, "惯用脚": 60}
+        self.tree_columns = columns
         for col in columns:
-            self.tree.heading(col, text=col)
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by_column(c))
             self.tree.column(col, width=column_widths.get(col, 100), anchor='center')
         
         scrollbar_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
@@ -477,16 +536,18 @@ class PlayerSearcherGUI:
     
     def guess_field_type(self, value):
         """智能猜测字段类型"""
-        if not self.df.empty:
+        if self.has_data():
+            columns = self.backend.columns
+            
             # 检查是否是国籍
-            if '国籍' in self.df.columns:
-                unique_nationalities = self.df['国籍'].astype(str).str.lower().unique()
+            if '国籍' in columns:
+                unique_nationalities = [v.lower() for v in self.backend.distinct_values('国籍')]
                 if str(value).lower() in unique_nationalities:
                     return '国籍'
             
             # 检查是否是球队
-            if '球队' in self.df.columns:
-                unique_clubs = self.df['球队'].astype(str).str.lower().unique()
+            if '球队' in columns:
+                unique_clubs = [v.lower() for v in self.backend.distinct_values('球队')]
                 if str(value).lower() in unique_clubs:
                     return '球队'
             
@@ -496,84 +557,23 @@ class PlayerSearcherGUI:
                 return '位置'
             
             # 检查是否是类型
-            if '类型' in self.df.columns and value in ['现役', '历史']:
+            if '类型' in columns and value in ['现役', '历史']:
                 return '类型'
             
             # 检查是否是惯用脚
-            if '惯用脚' in self.df.columns and value in ['左', '右']:
+            if '惯用脚' in columns and value in ['左', '右']:
                 return '惯用脚'
         
         # 默认猜测为国籍
         return '国籍'
     
     def advanced_search(self, conditions):
-        """执行高级搜索（支持身高和号码范围）"""
-        result = self.df.copy()
-        log_messages = []
-        
-        for condition in conditions:
-            field = condition['field']
-            value = condition['value']
-            match_type = condition['type']
-            
-            if field not in self.df.columns:
-                log_messages.append(f"⚠️ 字段不存在: '{field}'")
-                continue
-            
-            before_count = len(result)
-            
-            if match_type == 'exact':
-                # 精确匹配
-                if self.df[field].dtype in ['int64', 'float64']:
-                    result = result[result[field] == value]
-                    log_messages.append(f"🟢 {field} = {value}: {before_count} → {len(result)} 人")
-                else:
-                    result = result[result[field].astype(str) == str(value)]
-                    log_messages.append(f"🟢 {field} = '{value}': {before_count} → {len(result)} 人")
-            
-            elif match_type == 'close':
-                # 接近匹配（±5）
-                if self.df[field].dtype in ['int64', 'float64']:
-                    result = result[abs(result[field] - value) <= 5]
-                    log_messages.append(f"🔵 {field} ≈ {value} (±5): {before_count} → {len(result)} 人")
-                else:
-                    result = result[result[field].astype(str).str.contains(str(value), case=False, na=False)]
-                    log_messages.append(f"🔵 {field} 包含 '{value}': {before_count} → {len(result)} 人")
-            
-            elif match_type == 'contain':
-                # 包含匹配
-                result = result[result[field].astype(str).str.contains(str(value), case=False, na=False)]
-                log_messages.append(f"🔵 {field} 包含 '{value}': {before_count} → {len(result)} 人")
-            
-            elif match_type == 'greater':
-                # 大于
-                if self.df[field].dtype in ['int64', 'float64']:
-                    result = result[result[field] > value]
-                    log_messages.append(f"🔼 {field} > {value}: {before_count} → {len(result)} 人")
-            
-            elif match_type == 'less':
-                # 小于
-                if self.df[field].dtype in ['int64', 'float64']:
-                    result = result[result[field] < value]
-                    log_messages.append(f"🔽 {field} < {value}: {before_count} → {len(result)} 人")
-            
-            elif match_type == 'range':
-                # 范围匹配（适用于身高和号码）
-                start, end = value
-                if self.df[field].dtype in ['int64', 'float64']:
-                    result = result[(result[field] >= start) & (result[field] <= end)]
-                    log_messages.append(f"📏 {field} {start}-{end}: {before_count} → {len(result)} 人")
-            
-            # 如果筛选后为空，提前结束
-            if len(result) == 0:
-                log_messages.append(f"❌ 筛选后无结果，停止后续筛选")
-                break
-        
-        return result, log_messages
+        """执行高级搜索（支持身高和号码范围），由存储后端完成筛选"""
+        return self.backend.search(conditions)
     
     def search_players(self):
         """执行搜索"""
-        if self.df is None or self.df.empty:
+        if not self.has_data():
             messagebox.showerror("错误", "请先加载球员数据库！")
             return
         
@@ -590,62 +590,256 @@ class PlayerSearcherGUI:
                 return
             
             # 显示条件
-            cond_text = " | ".join([
-                f"{c['field']} {c['type']} {c['value']}" 
-                for c in conditions
-            ])
-            self.conditions_label.config(text=f"条件: {cond_text}")
+            self.show_conditions(conditions)
             
             # 执行搜索
             result, log_messages = self.advanced_search(conditions)
             
-            # 更新结果统计
-            self.result_count_label.config(
-                text=f"找到 {len(result)} 名球员",
-                foreground="green" if len(result) > 0 else "red"
-            )
-            
-            # 显示日志
-            self.log_text.delete(1.0, tk.END)
-            for log in log_messages:
-                self.log_text.insert(tk.END, f"{log}\n")
-            
-            # 清空表格
-            for row in self.tree.get_children():
-                self.tree.delete(row)
+            self.display_results(result, log_messages)
             
-            # 填充表格
-            if not result.empty:
-                for idx, row in result.iterrows():
-                    values = [
-                        row.get('姓名', ''),
-                        row.get('国籍', ''),
-                        row.get('球队', ''),
-                        row.get('位置', ''),
-                        row.get('身高', ''),
-                        row.get('号码', ''),
-                        row.get('类型', ''),
-                        row.get('惯用脚', '')
-                    ]
-                    self.tree.insert("", tk.END, values=values)
-                
-                # 更新统计信息
-                self.update_statistics(result)
-                
-                # 自动选择第一行
-                if self.tree.get_children():
-                    first_item = self.tree.get_children()[0]
-                    self.tree.selection_set(first_item)
-                    self.tree.focus(first_item)
-                    self.show_player_details()
-            else:
-                self.detail_text.delete(1.0, tk.END)
-                self.detail_text.insert(tk.END, "未找到符合条件的球员")
-                self.stats_label.config(text="无统计数据")
+            # 记录查询历史（写入失败不影响已显示的结果）
+            try:
+                self.search_store.add_history(SearchStore.make_entry(
+                    user_input, conditions, result, log_messages,
+                    self.backend.data_version, len(self.backend)
+                ))
+            except OSError as e:
+                self.history_save_failed(e)
+            self.update_history_window()
                 
         except Exception as e:
             messagebox.showerror("错误", f"搜索时出错：{str(e)}")
     
+    def show_conditions(self, conditions):
+        """在结果上方显示解析出的条件"""
+        cond_text = " | ".join([
+            f"{c['field']} {c['type']} {c['value']}" 
+            for c in conditions
+        ])
+        self.conditions_label.config(text=f"条件: {cond_text}")
+    
+    def display_results(self, result, log_messages):
+        """在表格中显示搜索结果和筛选日志"""
+        # 按当前排序列排序
+        if self.sort_column is not None:
+            result = self.sort_cache.sort(result, self.sort_column, self.sort_descending)
+        self.current_result = result
+        
+        # 更新结果统计
+        self.result_count_label.config(
+            text=f"找到 {len(result)} 名球员",
+            foreground="green" if len(result) > 0 else "red"
+        )
+        
+        # 显示日志
+        self.log_text.delete(1.0, tk.END)
+        for log in log_messages:
+            self.log_text.insert(tk.END, f"{log}\n")
+        
+        self.fill_tree(result)
+        
+        if not result.empty:
+            # 更新统计信息
+            self.update_statistics(result)
+        else:
+            self.detail_text.delete(1.0, tk.END)
+            self.detail_text.insert(tk.END, "未找到符合条件的球员")
+            self.stats_label.config(text="无统计数据")
+    
+    def fill_tree(self, result):
+        """填充结果表格并自动选择第一行"""
+        # 清空表格
+        for row in self.tree.get_children():
+            self.tree.delete(row)
+        
+        # 填充表格
+        for idx, row in result.iterrows():
+            values = [
+                row.get('姓名', ''),
+                row.get('国籍', ''),
+                row.get('球队', ''),
+                row.get('位置', ''),
+                row.get('身高', ''),
+                row.get('号码', ''),
+                row.get('类型', ''),
+                row.get('惯用脚', '')
+            ]
+            self.tree.insert("", tk.END, values=values)
+        
+        # 自动选择第一行
+        if self.tree.get_children():
+            first_item = self.tree.get_children()[0]
+            self.tree.selection_set(first_item)
+            self.tree.focus(first_item)
+            self.show_player_details()
+    
+    def sort_by_column(self, col):
+        """点击表头排序，再次点击同一列切换升序/降序"""
+        if self.sort_column == col:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = col
+            self.sort_descending = False
+        
+        # 在表头显示排序方向
+        for c in self.tree_columns:
+            arrow = (" ▼" if self.sort_descending else " ▲") if c == self.sort_column else ""
+            self.tree.heading(c, text=c + arrow)
+        
+        if self.current_result is not None and not self.current_result.empty:
+            self.current_result = self.sort_cache.sort(self.current_result, col, self.sort_descending)
+            self.fill_tree(self.current_result)
+    
+    def open_batch_window(self):
+        """打开批量求解窗口（每行一条线索，多进程并行筛选）"""
+        if not self.has_data():
+            messagebox.showerror("错误", "请先加载球员数据库！")
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("批量求解")
+        window.geometry("700x500")
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(2, weight=1)
+        
+        ttk.Label(window, text="每行输入一条线索:", font=("微软雅黑", 10)).grid(
+            row=0, column=0, sticky=tk.W, padx=10, pady=(10, 5))
+        
+        self.batch_input = scrolledtext.ScrolledText(window, height=8, font=("微软雅黑", 10))
+        self.batch_input.grid(row=1, column=0, sticky=(tk.W, tk.E), padx=10)
+        
+        self.batch_tree = ttk.Treeview(
+            window, 
+            columns=("线索", "结果数"), 
+            show="headings",
+            selectmode="browse"
+        )
+        self.batch_tree.heading("线索", text="线索")
+        self.batch_tree.heading("结果数", text="结果数")
+        self.batch_tree.column("线索", width=500)
+        self.batch_tree.column("结果数", width=80, anchor='center')
+        self.batch_tree.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10, pady=10)
+        self.batch_tree.bind('<Double-1>', lambda e: self.show_batch_result())
+        
+        bottom_frame = ttk.Frame(window)
+        bottom_frame.grid(row=3, column=0, sticky=(tk.W, tk.E), padx=10, pady=(0, 10))
+        
+        self.batch_status_label = ttk.Label(bottom_frame, text="双击结果行可在主表格中查看")
+        self.batch_status_label.pack(side=tk.LEFT)
+        
+        self.batch_run_btn = ttk.Button(
+            bottom_frame, 
+            text="开始求解", 
+            command=self.run_batch,
+            width=10
+        )
+        self.batch_run_btn.pack(side=tk.RIGHT)
+        
+        self.batch_export_btn = ttk.Button(
+            bottom_frame, 
+            text="导出全部", 
+            command=self.export_batch_results,
+            width=10,
+            state=tk.DISABLED if self.exporting else tk.NORMAL
+        )
+        self.batch_export_btn.pack(side=tk.RIGHT, padx=(0, 5))
+        
+        self.batch_results = []
+        self.batch_version = None
+    
+    def run_batch(self):
+        """解析全部线索，并在后台线程中并行求解"""
+        clues = [line.strip() for line in self.batch_input.get(1.0, tk.END).splitlines()]
+        clues = [clue for clue in clues if clue]
+        if not clues:
+            messagebox.showinfo("提示", "请输入搜索条件！", parent=self.batch_tree)
+            return
+        
+        conditions_list = [self.parse_input(clue) for clue in clues]
+        backend = self.backend
+        data_version = backend.data_version
+        
+        self.batch_run_btn.config(state=tk.DISABLED)
+        self.batch_status_label.config(text=f"正在并行求解 {len(clues)} 条线索...")
+        
+        def worker():
+            try:
+                df = self.batch_dataframe(backend)
+                # 未识别出条件的线索不提交求解，标记为无效
+                valid = [conditions for conditions in conditions_list if conditions]
+                solved = iter(solve_many(df, valid)) if valid else iter([])
+                outputs = [
+                    next(solved) if conditions else (df.iloc[:0], ["⚠️ 未能识别到有效条件！"])
+                    for conditions in conditions_list
+                ]
+                self.root.after(0, lambda: self.batch_done(clues, conditions_list, outputs, data_version))
+            except Exception as e:
+                error = str(e)
+                self.root.after(0, lambda: self.batch_failed(error))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def batch_dataframe(self, backend):
+        """批量求解所需的完整球员表（在后台线程中调用）
+        
+        并行求解需要把整表放入共享内存，因此批量模式总是需要一份内存副本；
+        SQLite 存储下该副本在首次批量求解时读取，之后同一数据版本直接复用。
+        """
+        with self.snapshot_lock:
+            if self.snapshot is None or self.snapshot[0] != backend.data_version:
+                reader = backend.reader()
+                try:
+                    self.snapshot = (backend.data_version, reader.to_dataframe())
+                finally:
+                    reader.close()
+            return self.snapshot[1]
+    
+    def batch_done(self, clues, conditions_list, outputs, data_version):
+        """批量求解完成后刷新结果列表"""
+        if not self.batch_tree.winfo_exists():
+            return
+        
+        self.batch_run_btn.config(state=tk.NORMAL)
+        if self.backend is None or self.backend.data_version != data_version:
+            # 求解期间数据已重新加载，结果的行号已失效
+            self.clear_batch_results()
+            return
+        
+        self.clear_batch_results()
+        self.batch_version = data_version
+        for clue, conditions, (result, log_messages) in zip(clues, conditions_list, outputs):
+            self.batch_results.append((clue, conditions, result, log_messages))
+            self.batch_tree.insert("", tk.END, values=(clue, len(result) if conditions else "无效"))
+        
+        self.batch_status_label.config(text=f"✓ 完成 {len(clues)} 条线索，双击结果行可在主表格中查看")
+    
+    def batch_failed(self, error):
+        """批量求解出错"""
+        if not self.batch_tree.winfo_exists():
+            return
+        
+        self.batch_run_btn.config(state=tk.NORMAL)
+        self.batch_status_label.config(text=f"✗ 求解失败: {error}")
+    
+    def clear_batch_results(self):
+        """清空批量求解结果（数据重新加载后旧结果的行号失效）"""
+        self.batch_results = []
+        self.batch_version = None
+        if self.batch_tree is not None and self.batch_tree.winfo_exists():
+            for row in self.batch_tree.get_children():
+                self.batch_tree.delete(row)
+            self.batch_status_label.config(text="数据已重新加载，请重新求解")
+    
+    def show_batch_result(self):
+        """在主表格中显示选中的批量求解结果"""
+        selection = self.batch_tree.selection()
+        if not selection:
+            return
+        
+        clue, conditions, result, log_messages = self.batch_results[self.batch_tree.index(selection[0])]
+        self.show_conditions(conditions)
+        self.display_results(result, log_messages)
+    
     def update_statistics(self, result):
         """更新统计信息"""
         stats_text = ""
@@ -692,11 +886,9 @@ class PlayerSearcherGUI:
         item = self.tree.item(selection[0])
         player_name = item['values'][0]
         
-        if not self.df.empty and '姓名' in self.df.columns:
-            player_data = self.df[self.df['姓名'] == player_name]
-            if not player_data.empty:
-                player_data = player_data.iloc[0]
-                
+        if self.has_data() and '姓名' in self.backend.columns:
+            player_data = self.backend.find_player(player_name)
+            if player_data is not None:
                 detail_text = f"【球员详情】\n{'='*30}\n"
                 detail_text += f"姓名: {player_data.get('姓名', 'N/A')}\n"
                 detail_text += f"国籍: {player_data.get('国籍', 'N/A')}\n"
@@ -709,7 +901,7 @@ class PlayerSearcherGUI:
                 
                 # 添加其他字段
                 shown_fields = ['姓名', '国籍', '球队', '位置', '身高', '号码', '类型', '惯用脚']
-                other_fields = [f for f in self.df.columns if f not in shown_fields]
+                other_fields = [f for f in self.backend.columns if f not in shown_fields]
                 
                 if other_fields:
                     detail_text += f"\n{'='*30}\n【其他信息】\n"
@@ -721,8 +913,271 @@ class PlayerSearcherGUI:
                 self.detail_text.delete(1.0, tk.END)
                 self.detail_text.insert(tk.END, detail_text)
     
+    def ask_export_path(self, parent):
+        """选择导出文件，扩展名决定格式"""
+        return filedialog.asksaveasfilename(
+            parent=parent,
+            title="导出结果",
+            defaultextension=".csv",
+            filetypes=[("CSV 文件", "*.csv"), ("JSON Lines 文件", "*.jsonl"), ("Excel 文件", "*.xlsx")]
+        )
+    
+    def export_current_result(self):
+        """导出当前搜索结果"""
+        if self.current_result is None or self.current_result.empty:
+            messagebox.showinfo("提示", "没有可导出的搜索结果！")
+            return
+        
+        path = self.ask_export_path(self.root)
+        if path:
+            result = self.current_result
+            self.start_export(iter_chunks(result), len(result), path, self.root)
+    
+    def export_batch_results(self):
+        """导出全部批量求解结果（首列为线索）"""
+        if not self.batch_results:
+            messagebox.showinfo("提示", "没有可导出的批量求解结果！", parent=self.batch_tree)
+            return
+        
+        parent = self.batch_tree.winfo_toplevel()
+        path = self.ask_export_path(parent)
+        if path:
+            batch_results = [(clue, result) for clue, conditions, result, log_messages in self.batch_results]
+            total = sum(len(result) for clue, result in batch_results)
+            self.start_export(iter_batch_chunks(batch_results), total, path, parent)
+    
+    def start_export(self, chunks, total, path, parent):
+        """在后台线程中分块写出，进度显示在状态栏"""
+        if self.exporting:
+            messagebox.showinfo("提示", "正在导出，请稍候！", parent=parent)
+            return
+        
+        self.exporting = True
+        self.set_export_buttons(tk.DISABLED)
+        self.status_label.config(text=f"正在导出 0/{total} 行...", foreground="black")
+        
+        def progress(written):
+            self.root.after(0, lambda: self.status_label.config(text=f"正在导出 {written}/{total} 行..."))
+        
+        def worker():
+            try:
+                written = export_chunks(chunks, path, progress)
+                self.root.after(0, lambda: self.export_done(
+                    f"✓ 已导出 {written} 行到 {os.path.basename(path)}", "green"))
+            except Exception as e:
+                error = str(e)
+                self.root.after(0, lambda: self.export_done(f"✗ 导出失败: {error}", "red"))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def export_done(self, message, color):
+        """导出结束后恢复按钮并显示结果"""
+        self.exporting = False
+        self.set_export_buttons(tk.NORMAL)
+        self.status_label.config(text=message, foreground=color)
+    
+    def set_export_buttons(self, state):
+        """同时启用/禁用主窗口和批量求解窗口的导出按钮"""
+        self.export_btn.config(state=state)
+        batch_export_btn = getattr(self, 'batch_export_btn', None)
+        if batch_export_btn is not None and batch_export_btn.winfo_exists():
+            batch_export_btn.config(state=state)
+    
+    def refresh_stale_searches(self):
+        """数据版本变化后，在后台重新计算历史和收藏中的结果"""
+        data_version = self.backend.data_version
+        stale = self.search_store.stale_entries(data_version)
+        if not stale:
+            return
+        
+        conditions_list = [restore_conditions(entry['conditions']) for entry in stale]
+        backend = self.backend
+        
+        def worker():
+            # 使用独立的读取副本逐条重新筛选，不在界面线程中读取整表
+            reader = backend.reader()
+            outputs = []
+            try:
+                for conditions in conditions_list:
+                    try:
+                        outputs.append(reader.search(conditions))
+                    except Exception:
+                        # 重新计算失败时保留旧记录，重放时会直接重新筛选
+                        outputs.append(None)
+            finally:
+                reader.close()
+            self.root.after(0, lambda: self.stale_searches_done(stale, outputs, data_version, len(backend)))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def stale_searches_done(self, stale, outputs, data_version, length):
+        """写回重新计算的结果"""
+        if self.backend is None or self.backend.data_version != data_version:
+            return
+        
+        for entry, output in zip(stale, outputs):
+            if output is not None:
+                result, log_messages = output
+                SearchStore.fill_result(entry, result, log_messages, data_version, length)
+        try:
+            self.search_store.save()
+        except OSError as e:
+            self.history_save_failed(e)
+        self.update_history_window()
+    
+    def history_save_failed(self, error):
+        """查询历史读写失败时只在状态栏提示，不影响搜索"""
+        self.status_label.config(text=f"✗ 查询历史读写失败: {error}", foreground="red")
+    
+    def replay_entry(self, entry):
+        """重放历史或收藏的搜索：数据版本一致时直接按保存的行号取结果"""
+        if not self.has_data():
+            messagebox.showerror("错误", "请先加载球员数据库！")
+            return
+        
+        conditions = restore_conditions(entry['conditions'])
+        if entry['data_version'] == self.backend.data_version:
+            result = self.backend.take(SearchStore.result_rows(entry))
+            log_messages = entry['log_messages']
+        else:
+            # 旧版本的记录重新筛选后写回，下次重放直接取行号
+            result, log_messages = self.advanced_search(conditions)
+            SearchStore.fill_result(entry, result, log_messages, self.backend.data_version, len(self.backend))
+            try:
+                self.search_store.save()
+            except OSError as e:
+                self.history_save_failed(e)
+            self.update_history_window()
+        
+        self.input_entry.delete(0, tk.END)
+        self.input_entry.insert(0, entry['query'])
+        self.show_conditions(conditions)
+        self.display_results(result, log_messages)
+    
+    def open_history_window(self):
+        """打开查询历史和收藏窗口"""
+        if self.search_store is None:
+            messagebox.showerror("错误", "请先加载球员数据库！")
+            return
+        
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.lift()
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("历史/收藏")
+        window.geometry("600x450")
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(0, weight=1)
+        self.history_window = window
+        
+        notebook = ttk.Notebook(window)
+        notebook.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10, pady=10)
+        
+        self.history_tree = ttk.Treeview(
+            notebook, 
+            columns=("线索", "结果数", "时间"), 
+            show="headings",
+            selectmode="browse"
+        )
+        self.saved_tree = ttk.Treeview(
+            notebook, 
+            columns=("名称", "线索", "结果数"), 
+            show="headings",
+            selectmode="browse"
+        )
+        for tree, widths in ((self.history_tree, (300, 70, 140)), (self.saved_tree, (150, 300, 70))):
+            for col, width in zip(tree['columns'], widths):
+                tree.heading(col, text=col)
+                tree.column(col, width=width, anchor='center' if col == "结果数" else tk.W)
+        
+        notebook.add(self.history_tree, text="查询历史")
+        notebook.add(self.saved_tree, text="收藏")
+        
+        self.history_tree.bind('<Double-1>', lambda e: self.replay_selected(self.history_tree))
+        self.saved_tree.bind('<Double-1>', lambda e: self.replay_selected(self.saved_tree))
+        
+        bottom_frame = ttk.Frame(window)
+        bottom_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), padx=10, pady=(0, 10))
+        
+        ttk.Label(bottom_frame, text="双击记录可直接重放").pack(side=tk.LEFT)
+        
+        ttk.Button(
+            bottom_frame, 
+            text="删除收藏", 
+            command=self.delete_selected_search,
+            width=10
+        ).pack(side=tk.RIGHT)
+        
+        ttk.Button(
+            bottom_frame, 
+            text="收藏选中", 
+            command=self.save_selected_search,
+            width=10
+        ).pack(side=tk.RIGHT, padx=(0, 5))
+        
+        self.update_history_window()
+    
+    def update_history_window(self):
+        """刷新历史和收藏列表"""
+        if self.history_window is None or not self.history_window.winfo_exists():
+            return
+        
+        for tree in (self.history_tree, self.saved_tree):
+            for row in tree.get_children():
+                tree.delete(row)
+        
+        for i, entry in enumerate(self.search_store.history):
+            self.history_tree.insert("", tk.END, iid=str(i), values=(entry['query'], entry['count'], entry['time']))
+        
+        for name, entry in self.search_store.saved.items():
+            self.saved_tree.insert("", tk.END, iid=name, values=(name, entry['query'], entry['count']))
+    
+    def selected_entry(self, tree):
+        """列表中选中的记录"""
+        selection = tree.selection()
+        if not selection:
+            return None
+        if tree is self.history_tree:
+            return self.search_store.history[int(selection[0])]
+        return self.search_store.saved[selection[0]]
+    
+    def replay_selected(self, tree):
+        entry = self.selected_entry(tree)
+        if entry is not None:
+            self.replay_entry(entry)
+    
+    def save_selected_search(self):
+        """将选中的历史记录收藏（需命名）"""
+        entry = self.selected_entry(self.history_tree)
+        if entry is None:
+            messagebox.showinfo("提示", "请先在查询历史中选择一条记录！", parent=self.history_window)
+            return
+        
+        name = simpledialog.askstring("收藏", "收藏名称:", initialvalue=entry['query'], parent=self.history_window)
+        if name and name.strip():
+            try:
+                self.search_store.save_search(name.strip(), entry)
+            except OSError as e:
+                self.history_save_failed(e)
+            self.update_history_window()
+    
+    def delete_selected_search(self):
+        """删除选中的收藏"""
+        selection = self.saved_tree.selection()
+        if not selection:
+            messagebox.showinfo("提示", "请先在收藏中选择一条记录！", parent=self.history_window)
+            return
+        
+        try:
+            self.search_store.delete_saved(selection[0])
+        except OSError as e:
+            self.history_save_failed(e)
+        self.update_history_window()
+    
     def clear_results(self):
         """清除搜索结果"""
+        self.current_result = None
         self.input_entry.delete(0, tk.END)
         self.result_count_label.config(text="准备就绪", foreground="black")
         self.conditions_label.config(text="")
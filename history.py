@@ -0,0 +1,118 @@
+import base64
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+
+# 查询历史最多保留的条数
+HISTORY_LIMIT = 50
+
+# 每条记录必须包含的字段
+ENTRY_KEYS = ('query', 'conditions', 'rows', 'length', 'count', 'log_messages', 'data_version', 'time')
+
+
+def encode_rows(rows, length):
+    """将结果行号编码为压缩位图（base64 字符串）"""
+    mask = np.zeros(length, dtype=bool)
+    mask[np.asarray(rows, dtype=np.int64)] = True
+    return base64.b64encode(zlib.compress(np.packbits(mask).tobytes())).decode('ascii')
+
+
+def decode_rows(data, length):
+    """从压缩位图还原结果行号"""
+    packed = np.frombuffer(zlib.decompress(base64.b64decode(data)), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(packed, count=length))
+
+
+def restore_conditions(conditions):
+    """JSON 中的区间条件还原为元组，与 parse_input 的输出一致"""
+    return [
+        dict(c, value=tuple(c['value'])) if c['type'] == 'range' else dict(c)
+        for c in conditions
+    ]
+
+
+def _valid_entry(entry):
+    """记录是否完整（缺字段的记录无法显示或重放）"""
+    return isinstance(entry, dict) and all(key in entry for key in ENTRY_KEYS)
+
+
+class SearchStore:
+    """查询历史和收藏的搜索，连同结果行号和数据版本保存在 JSON 文件中"""
+
+    def __init__(self, path):
+        self.path = path
+        self.history = []
+        self.saved = {}
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                # 文件损坏时从空记录开始，下次保存会覆盖
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+            # 结构不对的部分和不完整的记录直接丢弃
+            history = data.get('history')
+            saved = data.get('saved')
+            if isinstance(history, list):
+                self.history = [e for e in history if _valid_entry(e)]
+            if isinstance(saved, dict):
+                self.saved = {name: e for name, e in saved.items() if _valid_entry(e)}
+
+    def save(self):
+        """写入磁盘（先写临时文件再替换，避免写到一半损坏）"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'history': self.history, 'saved': self.saved}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def make_entry(query, conditions, result, log_messages, data_version, length):
+        """由一次搜索生成记录"""
+        entry = {'query': query, 'conditions': conditions}
+        SearchStore.fill_result(entry, result, log_messages, data_version, length)
+        return entry
+
+    @staticmethod
+    def fill_result(entry, result, log_messages, data_version, length):
+        """写入（或刷新）记录中的结果"""
+        entry.update({
+            'rows': encode_rows(result.index, length),
+            'length': length,
+            'count': len(result),
+            'log_messages': list(log_messages),
+            'data_version': data_version,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        })
+
+    @staticmethod
+    def result_rows(entry):
+        return decode_rows(entry['rows'], entry['length'])
+
+    def add_history(self, entry):
+        """追加到查询历史最前面，相同的查询只保留最新一条"""
+        self.history = [e for e in self.history if e['query'] != entry['query']]
+        self.history.insert(0, entry)
+        del self.history[HISTORY_LIMIT:]
+        self.save()
+
+    def save_search(self, name, entry):
+        self.saved[name] = dict(entry)
+        self.save()
+
+    def delete_saved(self, name):
+        self.saved.pop(name, None)
+        self.save()
+
+    def entries(self):
+        """全部记录（历史在前，收藏在后）"""
+        return self.history + list(self.saved.values())
+
+    def stale_entries(self, data_version):
+        """数据版本已变化、需要重新计算的记录"""
+        return [e for e in self.entries() if e['data_version'] != data_version]
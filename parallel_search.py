@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# 与 PlayerSearcherGUI.advanced_search 保持一致的数值列判定
+NUMERIC_DTYPES = ('int64', 'float64')
+
+# 工作进程内挂载的共享表：{列名: (类型, 数组, 类别列表)}
+_TABLE = {}
+_SHM_HANDLES = []
+
+
+class SharedPlayerTable:
+    """将球员表编码后放入共享内存，供多个工作进程只读挂载"""
+
+    def __init__(self, df):
+        self.length = len(df)
+        self.columns = list(df.columns)
+        self._blocks = []
+        self.spec = []
+
+        for col in self.columns:
+            series = df[col]
+            if str(series.dtype) in NUMERIC_DTYPES:
+                # 数值列保留原 dtype，NaN 比较结果为 False，与 pandas 一致
+                array = series.to_numpy(dtype=str(series.dtype))
+                kind, categories = 'numeric', None
+            else:
+                # 文本列按 astype(str) 后的取值编码，条件只需在类别上匹配一次
+                codes, uniques = pd.factorize(series.astype(str), sort=False)
+                array = codes.astype('int32')
+                kind, categories = 'text', [str(u) for u in uniques]
+
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            self._blocks.append(shm)
+            self.spec.append((col, kind, shm.name, array.dtype.str, self.length, categories))
+
+    def close(self):
+        """释放共享内存"""
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _attach_table(spec):
+    """工作进程初始化：挂载共享内存中的各列"""
+    _TABLE.clear()
+    for col, kind, name, dtype, length, categories in spec:
+        shm = shared_memory.SharedMemory(name=name)
+        _SHM_HANDLES.append(shm)
+        array = np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf)
+        _TABLE[col] = (kind, array, categories)
+
+
+def _text_mask(codes, categories, predicate):
+    """在类别上求值后映射回整列"""
+    matched = [i for i, c in enumerate(categories) if predicate(c)]
+    return np.isin(codes, matched)
+
+
+def _compile_pattern(value, log_messages):
+    """编译包含匹配的正则，无效时记入日志并返回 None"""
+    try:
+        return re.compile(str(value), re.IGNORECASE)
+    except re.error as e:
+        log_messages.append(f"❌ 无效的匹配文本 '{value}': {e}")
+        return None
+
+
+def evaluate_conditions(conditions, table=None):
+    """在编码后的列上执行筛选，返回 (行号数组, 日志)，规则与 advanced_search 相同"""
+    table = _TABLE if table is None else table
+    length = len(next(iter(table.values()))[1]) if table else 0
+    mask = np.ones(length, dtype=bool)
+    count = length
+    log_messages = []
+
+    for condition in conditions:
+        field = condition['field']
+        value = condition['value']
+        match_type = condition['type']
+
+        if field not in table:
+            log_messages.append(f"⚠️ 字段不存在: '{field}'")
+            continue
+
+        kind, array, categories = table[field]
+        numeric = kind == 'numeric'
+        before_count = count
+        step = None
+
+        if match_type == 'exact':
+            if numeric:
+                step = array == value
+                message = f"🟢 {field} = {value}"
+            else:
+                step = _text_mask(array, categories, lambda c: c == str(value))
+                message = f"🟢 {field} = '{value}'"
+
+        elif match_type in ('close', 'contain'):
+            if numeric and match_type == 'close':
+                step = np.abs(array - value) <= 5
+                message = f"🔵 {field} ≈ {value} (±5)"
+            elif numeric:
+                # 数值列的包含匹配按 astype(str) 的文本处理
+                pattern = _compile_pattern(value, log_messages)
+                if pattern is None:
+                    return np.array([], dtype=np.int64), log_messages
+                text = pd.Series(array).astype(str)
+                step = text.str.contains(pattern, na=False).to_numpy()
+                message = f"🔵 {field} 包含 '{value}'"
+            else:
+                pattern = _compile_pattern(value, log_messages)
+                if pattern is None:
+                    return np.array([], dtype=np.int64), log_messages
+                step = _text_mask(array, categories, lambda c: pattern.search(c) is not None)
+                message = f"🔵 {field} 包含 '{value}'"
+
+        elif match_type == 'greater':
+            if numeric:
+                step = array > value
+                message = f"🔼 {field} > {value}"
+
+        elif match_type == 'less':
+            if numeric:
+                step = array < value
+                message = f"🔽 {field} < {value}"
+
+        elif match_type == 'range':
+            start, end = value
+            if numeric:
+                step = (array >= start) & (array <= end)
+                message = f"📏 {field} {start}-{end}"
+
+        if step is not None:
+            mask &= step
+            count = int(mask.sum())
+            log_messages.append(f"{message}: {before_count} → {count} 人")
+
+        # 如果筛选后为空，提前结束
+        if count == 0:
+            log_messages.append(f"❌ 筛选后无结果，停止后续筛选")
+            break
+
+    return np.flatnonzero(mask), log_messages
+
+
+def solve_many(df, conditions_list, max_workers=None):
+    """并行求解多组条件，返回与 conditions_list 同序的 [(结果DataFrame, 日志), ...]"""
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(conditions_list) or 1))
+
+    with SharedPlayerTable(df) as table:
+        # 调用方可能是多线程的界面进程，用 spawn 启动工作进程以免 fork 继承其他线程持有的锁
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_attach_table,
+            initargs=(table.spec,)
+        ) as executor:
+            chunksize = max(1, len(conditions_list) // (max_workers * 4))
+            outputs = list(executor.map(evaluate_conditions, conditions_list, chunksize=chunksize))
+
+    return [(df.iloc[rows], log_messages) for rows, log_messages in outputs]
@@ -0,0 +1,27 @@
+import numpy as np
+
+
+class SortCache:
+    """每次加载数据后，按列缓存整表的排序排列，结果集排序只需 O(N) 过滤"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.length = len(backend)
+        self._permutations = {}
+
+    def permutation(self, field, descending=False):
+        """整表按该列排序的行号排列（升序、降序各缓存一份），首次使用时计算"""
+        key = (field, descending)
+        if key not in self._permutations:
+            self._permutations[key] = self.backend.sort_permutation(field, descending)
+        return self._permutations[key]
+
+    def sort(self, result, field, descending=False):
+        """用全表排列按结果集掩码过滤，得到排序后的结果"""
+        if field not in self.backend.columns or result.empty:
+            return result
+
+        perm = self.permutation(field, descending)
+        mask = np.zeros(self.length, dtype=bool)
+        mask[result.index.to_numpy()] = True
+        return result.loc[perm[mask[perm]]]
@@ -0,0 +1,418 @@
+import copy
+import os
+import re
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# 重命名列名，使更符合习惯
+COLUMN_MAPPING = {
+    '球员': '姓名',
+    '背号': '号码',
+    '俱乐部': '球队',
+    '惯用脚': '惯用脚'
+}
+
+REQUIRED_COLUMNS = ['姓名', '位置', '类型', '号码', '球队', '国籍', '身高', '惯用脚']
+
+# SQLite 中建立索引的列（姓名用于详情查询）
+INDEXED_COLUMNS = ['国籍', '球队', '位置', '身高', '号码', '姓名']
+
+# astype(str) 对空值的处理随 pandas 版本不同：3.0 之前转为 'nan'，之后保持为空值
+NULL_AS_TEXT = pd.Series([np.nan], dtype=object).astype(str).iloc[0] == 'nan'
+
+# 文本列“包含”匹配时，候选取值超过该数量则改用逐行正则
+MAX_IN_VALUES = 500
+
+
+def file_stamp(path):
+    """数据版本：文件的修改时间和大小"""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def read_players(excel_file):
+    """读取 Excel 球员数据并统一列名和类型"""
+    df = pd.read_excel(excel_file)
+    df = df.rename(columns=COLUMN_MAPPING)
+
+    # 将号码列转换为数值类型（处理可能的NaN值）
+    if '号码' in df.columns:
+        df['号码'] = pd.to_numeric(df['号码'], errors='coerce')
+
+    return df
+
+
+class DataFrameBackend:
+    """内存存储：整个球员表保存在 pandas DataFrame 中"""
+
+    def __init__(self, excel_file):
+        self.data_version = file_stamp(excel_file)
+        self.df = read_players(excel_file)
+        self.columns = list(self.df.columns)
+
+    def __len__(self):
+        return len(self.df)
+
+    def is_numeric(self, field):
+        return self.df[field].dtype in ['int64', 'float64']
+
+    def distinct_values(self, field):
+        """字段的全部取值（转为字符串）"""
+        return self.df[field].astype(str).dropna().unique().tolist()
+
+    def top_values(self, field, n):
+        """出现次数最多的 n 个取值"""
+        return self.df[field].value_counts().head(n).index.tolist()
+
+    def find_player(self, name):
+        """按姓名查找球员，返回第一条记录或 None"""
+        player_data = self.df[self.df['姓名'] == name]
+        if player_data.empty:
+            return None
+        return player_data.iloc[0]
+
+    def take(self, rows):
+        """按行号取出球员"""
+        return self.df.iloc[rows]
+
+    def sort_permutation(self, field, descending=False):
+        """整表按该列排序的行号排列（稳定排序，相同值保持原顺序，空值在后）"""
+        column = self.df[field].reset_index(drop=True)
+        return column.sort_values(
+            ascending=not descending, kind='stable', na_position='last'
+        ).index.to_numpy()
+
+    def to_dataframe(self):
+        return self.df
+
+    def reader(self):
+        """供后台线程使用的副本，DataFrame 只读共享即可"""
+        return self
+
+    def close(self):
+        pass
+
+    def search(self, conditions):
+        """执行高级搜索（支持身高和号码范围）"""
+        result = self.df.copy()
+        log_messages = []
+
+        for condition in conditions:
+            field = condition['field']
+            value = condition['value']
+            match_type = condition['type']
+
+            if field not in self.df.columns:
+                log_messages.append(f"⚠️ 字段不存在: '{field}'")
+                continue
+
+            before_count = len(result)
+
+            if match_type == 'exact':
+                # 精确匹配
+                if self.is_numeric(field):
+                    result = result[result[field] == value]
+                    log_messages.append(f"🟢 {field} = {value}: {before_count} → {len(result)} 人")
+                else:
+                    result = result[result[field].astype(str) == str(value)]
+                    log_messages.append(f"🟢 {field} = '{value}': {before_count} → {len(result)} 人")
+
+            elif match_type == 'close':
+                # 接近匹配（±5）
+                if self.is_numeric(field):
+                    result = result[abs(result[field] - value) <= 5]
+                    log_messages.append(f"🔵 {field} ≈ {value} (±5): {before_count} → {len(result)} 人")
+                else:
+                    result = result[result[field].astype(str).str.contains(str(value), case=False, na=False)]
+                    log_messages.append(f"🔵 {field} 包含 '{value}': {before_count} → {len(result)} 人")
+
+            elif match_type == 'contain':
+                # 包含匹配
+                result = result[result[field].astype(str).str.contains(str(value), case=False, na=False)]
+                log_messages.append(f"🔵 {field} 包含 '{value}': {before_count} → {len(result)} 人")
+
+            elif match_type == 'greater':
+                # 大于
+                if self.is_numeric(field):
+                    result = result[result[field] > value]
+                    log_messages.append(f"🔼 {field} > {value}: {before_count} → {len(result)} 人")
+
+            elif match_type == 'less':
+                # 小于
+                if self.is_numeric(field):
+                    result = result[result[field] < value]
+                    log_messages.append(f"🔽 {field} < {value}: {before_count} → {len(result)} 人")
+
+            elif match_type == 'range':
+                # 范围匹配（适用于身高和号码）
+                start, end = value
+                if self.is_numeric(field):
+                    result = result[(result[field] >= start) & (result[field] <= end)]
+                    log_messages.append(f"📏 {field} {start}-{end}: {before_count} → {len(result)} 人")
+
+            # 如果筛选后为空，提前结束
+            if len(result) == 0:
+                log_messages.append(f"❌ 筛选后无结果，停止后续筛选")
+                break
+
+        return result, log_messages
+
+
+def _quote(name):
+    """SQL 标识符加引号"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _regexp(pattern, value):
+    """SQLite REGEXP 函数：与 pandas str.contains(case=False) 相同的忽略大小写正则"""
+    if value is None:
+        if not NULL_AS_TEXT:
+            return False
+        value = 'nan'
+    return re.search(pattern, str(value), re.IGNORECASE) is not None
+
+
+class SQLiteBackend:
+    """磁盘存储：首次导入 Excel 到 SQLite 数据库，之后通过索引查询"""
+
+    def __init__(self, excel_file, db_file=None):
+        self.excel_file = excel_file
+        self.db_file = db_file or os.path.splitext(excel_file)[0] + '.db'
+        self.conn = self.connect()
+
+        if not self.is_fresh():
+            self.import_excel()
+        self.data_version = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'source'"
+        ).fetchone()[0]
+
+        info = self.conn.execute("PRAGMA table_info(players)").fetchall()
+        self.columns = [row[1] for row in info]
+        self.numeric_columns = {row[1] for row in info if row[2].upper() in ('INTEGER', 'REAL')}
+        # 全为空值的 REAL 列读回时保持 float64，与 Excel 读入的结果一致
+        self.real_columns = {row[1]: 'float64' for row in info if row[2].upper() == 'REAL'}
+        self._distinct_cache = {}
+        self.length = self.conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+
+    def connect(self):
+        """打开数据库连接并注册 REGEXP 函数"""
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.create_function('REGEXP', 2, _regexp, deterministic=True)
+        return conn
+
+    def is_fresh(self):
+        """数据库是否已由当前版本的 Excel 导入"""
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        except sqlite3.OperationalError:
+            return False
+        return row is not None and row[0] == file_stamp(self.excel_file)
+
+    def import_excel(self):
+        """将 Excel 导入数据库并建立索引"""
+        df = read_players(self.excel_file)
+        with self.conn:
+            self.conn.execute("DROP TABLE IF EXISTS players")
+            self.conn.execute("DROP TABLE IF EXISTS meta")
+            df.to_sql('players', self.conn, index=False)
+            for col in INDEXED_COLUMNS:
+                if col in df.columns:
+                    self.conn.execute(
+                        f"CREATE INDEX {_quote('idx_players_' + col)} ON players ({_quote(col)})"
+                    )
+            self.conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.conn.execute("INSERT INTO meta VALUES ('source', ?)", (file_stamp(self.excel_file),))
+
+    def __len__(self):
+        return self.length
+
+    def is_numeric(self, field):
+        return field in self.numeric_columns
+
+    def distinct_values(self, field):
+        """字段的全部取值（转为字符串），使用索引扫描并缓存"""
+        if field not in self._distinct_cache:
+            rows = self.conn.execute(
+                f"SELECT DISTINCT {_quote(field)} FROM players"
+            ).fetchall()
+            self._distinct_cache[field] = [
+                'nan' if v is None else str(v) for (v,) in rows if v is not None or NULL_AS_TEXT
+            ]
+        return self._distinct_cache[field]
+
+    def top_values(self, field, n):
+        """出现次数最多的 n 个取值（次数相同时按首次出现顺序）"""
+        col = _quote(field)
+        rows = self.conn.execute(
+            f"SELECT {col} FROM players WHERE {col} IS NOT NULL "
+            f"GROUP BY {col} ORDER BY COUNT(*) DESC, MIN(rowid) LIMIT ?",
+            (n,)
+        ).fetchall()
+        return [v for (v,) in rows]
+
+    def query(self, where="1", params=(), order_by="rowid", limit=None, source="players"):
+        """按条件读取球员，行索引与 Excel 中的行号一致"""
+        sql = (
+            f"SELECT players.rowid - 1 AS _row, players.* FROM {source} "
+            f"WHERE {where} ORDER BY {order_by}"
+        )
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        df = pd.read_sql_query(
+            sql, self.conn, params=list(params), index_col='_row', dtype=self.real_columns
+        )
+        df.index.name = None
+        # 空文本读回为 None，统一为 NaN，与 Excel 读入的结果一致
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+        return df
+
+    def find_player(self, name):
+        """按姓名查找球员，返回第一条记录或 None"""
+        player_data = self.query(f"{_quote('姓名')} = ?", (name,), limit=1)
+        if player_data.empty:
+            return None
+        return player_data.iloc[0]
+
+    def take(self, rows):
+        """按行号取出球员：行号写入临时表后一次 JOIN 读取，按传入顺序返回"""
+        with self.conn:
+            self.conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS take_rows (pos INTEGER PRIMARY KEY, row_id INTEGER)"
+            )
+            self.conn.execute("DELETE FROM temp.take_rows")
+            self.conn.executemany(
+                "INSERT INTO temp.take_rows VALUES (?, ?)",
+                ((pos, int(r) + 1) for pos, r in enumerate(rows))
+            )
+        return self.query(
+            source="players JOIN temp.take_rows ON players.rowid = take_rows.row_id",
+            order_by="take_rows.pos"
+        )
+
+    def sort_permutation(self, field, descending=False):
+        """整表按该列排序的行号排列（相同值按行号，空值在后），有索引的列直接按索引顺序读取"""
+        col = _quote(field)
+        direction = "DESC" if descending else "ASC"
+        rows = self.conn.execute(
+            f"SELECT rowid - 1 FROM players ORDER BY {col} IS NULL, {col} {direction}, rowid"
+        ).fetchall()
+        return np.fromiter((r for (r,) in rows), dtype=np.int64, count=len(rows))
+
+    def to_dataframe(self):
+        return self.query()
+
+    def reader(self):
+        """供后台线程使用的副本：共享表结构信息，使用独立的数据库连接"""
+        clone = copy.copy(self)
+        clone.conn = self.connect()
+        clone._distinct_cache = {}
+        return clone
+
+    def close(self):
+        self.conn.close()
+
+    def _text_match(self, field, pattern):
+        """文本包含匹配：先在去重取值上求正则，再用 IN 走索引"""
+        col = _quote(field)
+        matched = [v for v in self.distinct_values(field) if _regexp(pattern, v)]
+        if len(matched) > MAX_IN_VALUES:
+            return f"{col} REGEXP ?", [pattern]
+        if not matched:
+            return "0", []
+        placeholders = ", ".join("?" * len(matched))
+        sql = f"{col} IN ({placeholders})"
+        # 旧版 pandas 中空值按 'nan' 参与匹配
+        if NULL_AS_TEXT and 'nan' in matched:
+            sql += f" OR {col} IS NULL"
+        return sql, matched
+
+    def translate(self, condition):
+        """将 parse_input 的条件转换为 (SQL 片段, 参数, 日志前缀)，不适用时返回 None"""
+        field = condition['field']
+        value = condition['value']
+        match_type = condition['type']
+        col = _quote(field)
+        numeric = self.is_numeric(field)
+
+        if match_type == 'exact':
+            if numeric:
+                return f"{col} = ?", [value], f"🟢 {field} = {value}"
+            if NULL_AS_TEXT and str(value) == 'nan':
+                return f"({col} = ? OR {col} IS NULL)", [str(value)], f"🟢 {field} = '{value}'"
+            return f"{col} = ?", [str(value)], f"🟢 {field} = '{value}'"
+
+        if match_type == 'close' and numeric:
+            # 改写为 BETWEEN 以便使用索引
+            return f"{col} BETWEEN ? AND ?", [value - 5, value + 5], f"🔵 {field} ≈ {value} (±5)"
+
+        if match_type in ('close', 'contain'):
+            if numeric:
+                sql, params = f"CAST({col} AS TEXT) REGEXP ?", [str(value)]
+            else:
+                sql, params = self._text_match(field, str(value))
+            return sql, params, f"🔵 {field} 包含 '{value}'"
+
+        if not numeric:
+            return None
+
+        if match_type == 'greater':
+            return f"{col} > ?", [value], f"🔼 {field} > {value}"
+
+        if match_type == 'less':
+            return f"{col} < ?", [value], f"🔽 {field} < {value}"
+
+        if match_type == 'range':
+            start, end = value
+            return f"{col} BETWEEN ? AND ?", [start, end], f"📏 {field} {start}-{end}"
+
+        return None
+
+    def search(self, conditions):
+        """将条件转换为参数化查询执行搜索，日志与内存存储一致"""
+        clauses = []
+        params = []
+        count = self.length
+        log_messages = []
+
+        for condition in conditions:
+            field = condition['field']
+
+            if field not in self.columns:
+                log_messages.append(f"⚠️ 字段不存在: '{field}'")
+                continue
+
+            before_count = count
+            translated = self.translate(condition)
+
+            if translated is not None:
+                sql, sql_params, message = translated
+                clauses.append(f"({sql})")
+                params.extend(sql_params)
+                count = self.conn.execute(
+                    f"SELECT COUNT(*) FROM players WHERE {' AND '.join(clauses)}", params
+                ).fetchone()[0]
+                log_messages.append(f"{message}: {before_count} → {count} 人")
+
+            # 如果筛选后为空，提前结束
+            if count == 0:
+                log_messages.append(f"❌ 筛选后无结果，停止后续筛选")
+                break
+
+        where = " AND ".join(clauses) if clauses else "1"
+        return self.query(where, params), log_messages
+
+
+BACKENDS = {
+    'dataframe': DataFrameBackend,
+    'sqlite': SQLiteBackend,
+}
+
+
+def open_backend(excel_file, kind='sqlite'):
+    """按名称创建存储后端"""
+    if kind not in BACKENDS:
+        raise ValueError(f"未知的存储后端：{kind}")
+    return BACKENDS[kind](excel_file)
@@ -0,0 +1,86 @@
+import os
+import random
+import sys
+import types
+
+import pytest
+
+# 测试直接导入仓库根目录下的模块
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+EXCEL_FILE = os.path.join(ROOT, "况两把.xlsx")
+
+from gui import PlayerSearcherGUI
+from storage import DataFrameBackend, SQLiteBackend
+
+
+@pytest.fixture(scope="session")
+def excel_file():
+    """仓库自带的球员数据库"""
+    return EXCEL_FILE
+
+
+@pytest.fixture(scope="session")
+def frame_backend(excel_file):
+    return DataFrameBackend(excel_file)
+
+
+@pytest.fixture(scope="session")
+def sqlite_backend(excel_file, tmp_path_factory):
+    backend = SQLiteBackend(excel_file, str(tmp_path_factory.mktemp("db") / "players.db"))
+    yield backend
+    backend.close()
+
+
+@pytest.fixture(scope="session")
+def parse_clue():
+    """用 GUI 的 parse_input 解析线索（不创建窗口）"""
+    def parse(backend, clue):
+        fake = types.SimpleNamespace(backend=backend, has_data=lambda: True)
+        fake.guess_field_type = lambda value: PlayerSearcherGUI.guess_field_type(fake, value)
+        return PlayerSearcherGUI.parse_input(fake, clue)
+    return parse
+
+
+@pytest.fixture(scope="session")
+def random_clues():
+    """由真实取值、位置关键词和数字组成的随机线索"""
+    def generate(backend, count, seed=0):
+        rng = random.Random(seed)
+        nationalities = backend.distinct_values('国籍')
+        clubs = backend.distinct_values('球队')
+        positions = ["中锋", "边锋", "前腰", "后卫", "门将", "锋", "左", "右", "现役", "历史"]
+
+        def token():
+            kind = rng.randrange(8)
+            if kind == 0:
+                return rng.choice(nationalities)
+            if kind == 1:
+                return rng.choice(clubs)
+            if kind == 2:
+                return rng.choice(positions)
+            if kind == 3:
+                return str(rng.choice([rng.randint(160, 200), rng.randint(1, 40)]))
+            if kind == 4:
+                start = rng.randint(165, 190)
+                return f"{start}-{start + rng.randint(0, 10)}"
+            if kind == 5:
+                start = rng.randint(1, 30)
+                return f"{start}-{start + rng.randint(0, 15)}"
+            if kind == 6:
+                return rng.choice("<>") + str(rng.choice([rng.randint(165, 195), rng.randint(2, 30)]))
+            return "=" + rng.choice([str(rng.randint(170, 185)), str(rng.randint(1, 20)), rng.choice(nationalities)])
+
+        return [" ".join(token() for _ in range(rng.randint(1, 3))) for _ in range(count)]
+    return generate
+
+
+@pytest.fixture(scope="session")
+def assert_same_result():
+    """比较两次搜索的 (结果, 日志)"""
+    def check(expected, actual):
+        (expected_rows, expected_logs), (actual_rows, actual_logs) = expected, actual
+        assert list(actual_rows.index) == list(expected_rows.index)
+        assert actual_logs == expected_logs
+    return check
@@ -0,0 +1,40 @@
+import json
+
+import pandas as pd
+import pytest
+
+from export import export_chunks, iter_chunks, iter_batch_chunks
+
+
+@pytest.mark.parametrize("ext", ['csv', 'jsonl', 'xlsx'])
+def test_export_writers(frame_backend, tmp_path, ext):
+    result = frame_backend.df.head(25)
+    path = str(tmp_path / f"result.{ext}")
+    progress = []
+
+    assert export_chunks(iter_chunks(result, chunk_size=10), path, progress.append) == 25
+    assert progress == [10, 20, 25]
+
+    if ext == 'csv':
+        written = pd.read_csv(path, encoding='utf-8-sig')
+    elif ext == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            written = pd.DataFrame([json.loads(line) for line in f])
+    else:
+        written = pd.read_excel(path)
+    assert list(written.columns) == list(result.columns)
+    assert written['姓名'].tolist() == result['姓名'].tolist()
+    assert written['身高'].tolist() == result['身高'].tolist()
+
+
+def test_batch_export_prefixes_clue(frame_backend, tmp_path):
+    path = str(tmp_path / "batch.csv")
+    batches = [('巴西', frame_backend.df.head(3)), ('中锋', frame_backend.df.tail(2))]
+    export_chunks(iter_batch_chunks(batches), path)
+    written = pd.read_csv(path, encoding='utf-8-sig')
+    assert written['线索'].tolist() == ['巴西'] * 3 + ['中锋'] * 2
+
+
+def test_unknown_export_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_chunks(iter([]), str(tmp_path / "result.txt"))
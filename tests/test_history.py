@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from history import HISTORY_LIMIT, SearchStore, encode_rows, decode_rows, restore_conditions
+
+CONDITIONS = [{'field': '身高', 'value': (175, 180), 'type': 'range'}]
+
+
+@pytest.fixture
+def history_file(tmp_path):
+    return str(tmp_path / "players_history.json")
+
+
+def make_entry(backend, query, data_version=None):
+    result, log_messages = backend.search(restore_conditions(CONDITIONS))
+    return SearchStore.make_entry(
+        query, CONDITIONS, result, log_messages,
+        backend.data_version if data_version is None else data_version, len(backend)
+    )
+
+
+@pytest.mark.parametrize("rows, length", [([], 10), ([0, 3, 9], 10), (list(range(0, 769, 7)), 769)])
+def test_row_bitmap_round_trip(rows, length):
+    assert decode_rows(encode_rows(rows, length), length).tolist() == rows
+
+
+def test_save_and_load_round_trip(frame_backend, history_file):
+    store = SearchStore(history_file)
+    entry = make_entry(frame_backend, "175-180")
+    store.add_history(entry)
+    store.save_search("中等身高", entry)
+
+    loaded = SearchStore(history_file)
+    assert [e['query'] for e in loaded.history] == ["175-180"]
+    assert list(loaded.saved) == ["中等身高"]
+
+    replayed = loaded.history[0]
+    expected = frame_backend.search(restore_conditions(CONDITIONS))[0]
+    assert SearchStore.result_rows(replayed).tolist() == list(expected.index)
+    assert replayed['count'] == len(expected)
+    assert restore_conditions(replayed['conditions']) == restore_conditions(CONDITIONS)
+
+
+def test_history_dedup_and_limit(frame_backend, history_file):
+    store = SearchStore(history_file)
+    for i in range(HISTORY_LIMIT + 5):
+        store.add_history(make_entry(frame_backend, f"查询{i}"))
+    store.add_history(make_entry(frame_backend, "查询10"))
+
+    queries = [e['query'] for e in SearchStore(history_file).history]
+    assert len(queries) == HISTORY_LIMIT
+    assert queries[0] == "查询10"
+    assert queries.count("查询10") == 1
+
+
+def test_stale_entries(frame_backend, history_file):
+    store = SearchStore(history_file)
+    current = make_entry(frame_backend, "当前")
+    old = make_entry(frame_backend, "旧版本", data_version="old")
+    store.add_history(current)
+    store.add_history(old)
+    store.save_search("收藏", old)
+
+    stale = store.stale_entries(frame_backend.data_version)
+    assert [e['query'] for e in stale] == ["旧版本", "旧版本"]
+    assert store.stale_entries("old") == [current]
+
+
+@pytest.mark.parametrize("content", [
+    "{not json",
+    json.dumps([1, 2, 3]),
+    json.dumps({'history': {'query': 'x'}, 'saved': []}),
+])
+def test_invalid_file_starts_empty(history_file, content):
+    with open(history_file, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+    store = SearchStore(history_file)
+    assert store.history == [] and store.saved == {}
+    assert store.stale_entries(1) == []
+
+
+def test_incomplete_entries_are_dropped(frame_backend, history_file):
+    entry = make_entry(frame_backend, "完整")
+    broken = {k: v for k, v in entry.items() if k != 'data_version'}
+    with open(history_file, 'w', encoding='utf-8') as f:
+        json.dump({'history': [broken, entry, "x"], 'saved': {'坏': {'query': 'y'}, '好': entry}}, f)
+
+    store = SearchStore(history_file)
+    assert [e['query'] for e in store.history] == ["完整"]
+    assert list(store.saved) == ["好"]
+    assert store.stale_entries("old") == [store.history[0], store.saved["好"]]
@@ -0,0 +1,43 @@
+import pytest
+
+from parallel_search import solve_many, SharedPlayerTable, evaluate_conditions, _attach_table, _TABLE
+
+GOOD = [{'field': '国籍', 'value': '巴西', 'type': 'contain'}]
+BAD = [{'field': '国籍', 'value': '(', 'type': 'contain'}]
+
+
+def test_matches_dataframe_search(frame_backend, parse_clue, random_clues, assert_same_result):
+    conditions_list = [parse_clue(frame_backend, clue) for clue in random_clues(frame_backend, 100, seed=1)]
+    outputs = solve_many(frame_backend.df, conditions_list, max_workers=2)
+
+    assert len(outputs) == len(conditions_list)
+    for conditions, output in zip(conditions_list, outputs):
+        assert_same_result(frame_backend.search(conditions), output)
+
+
+@pytest.mark.parametrize("conditions", [
+    [{'field': '身高', 'value': '8', 'type': 'contain'}],
+    [{'field': '类型', 'value': '现役', 'type': 'greater'}],
+    [{'field': '不存在', 'value': 1, 'type': 'exact'}, {'field': '身高', 'value': 400, 'type': 'close'}],
+    [],
+])
+def test_edge_conditions(frame_backend, assert_same_result, conditions):
+    output = solve_many(frame_backend.df, [conditions], max_workers=1)[0]
+    assert_same_result(frame_backend.search(conditions), output)
+
+
+def test_invalid_pattern_gives_empty_result(frame_backend):
+    with SharedPlayerTable(frame_backend.df) as table:
+        _attach_table(table.spec)
+        try:
+            rows, log_messages = evaluate_conditions(BAD)
+        finally:
+            _TABLE.clear()
+    assert len(rows) == 0
+    assert log_messages[-1].startswith("❌ 无效的匹配文本")
+
+
+def test_invalid_pattern_keeps_other_clues(frame_backend):
+    outputs = solve_many(frame_backend.df, [GOOD, BAD, GOOD], max_workers=2)
+    expected = len(frame_backend.search(GOOD)[0])
+    assert [len(result) for result, log_messages in outputs] == [expected, 0, expected]
@@ -0,0 +1,15 @@
+import pytest
+
+from sorting import SortCache
+
+
+@pytest.mark.parametrize("field", ['身高', '号码', '国籍', 'Unnamed: 9'])
+@pytest.mark.parametrize("descending", [False, True])
+def test_sort_cache_is_stable(frame_backend, sqlite_backend, field, descending):
+    conditions = [{'field': '位置', 'value': '锋', 'type': 'contain'}]
+    result = frame_backend.search(conditions)[0]
+    expected = result.sort_values(field, ascending=not descending, kind='stable', na_position='last')
+
+    for backend in (frame_backend, sqlite_backend):
+        sorted_result = SortCache(backend).sort(backend.search(conditions)[0], field, descending)
+        assert list(sorted_result.index) == list(expected.index)
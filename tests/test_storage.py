@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+import storage
+from parallel_search import solve_many
+from storage import SQLiteBackend
+
+
+def test_backends_and_parallel_agree(frame_backend, sqlite_backend, parse_clue, random_clues, assert_same_result):
+    conditions_list = [parse_clue(frame_backend, clue) for clue in random_clues(frame_backend, 300)]
+    parallel = solve_many(frame_backend.df, conditions_list, max_workers=2)
+
+    for conditions, parallel_output in zip(conditions_list, parallel):
+        expected = frame_backend.search(conditions)
+        assert_same_result(expected, sqlite_backend.search(conditions))
+        assert_same_result(expected, parallel_output)
+
+
+@pytest.mark.parametrize("conditions", [
+    # 空值是否按 'nan' 参与匹配随 pandas 版本而定，两种存储需保持一致
+    [{'field': 'Unnamed: 9', 'value': 'nan', 'type': 'contain'}],
+    [{'field': 'Unnamed: 8', 'value': 'na', 'type': 'contain'}],
+    [{'field': 'Unnamed: 9', 'value': 'nan', 'type': 'exact'}],
+    [{'field': '身高', 'value': '8', 'type': 'contain'}],
+    [{'field': '国籍', 'value': '巴西', 'type': 'exact'}, {'field': '号码', 'value': 10, 'type': 'less'}],
+    [{'field': '类型', 'value': '现役', 'type': 'greater'}],
+    [{'field': '不存在', 'value': 1, 'type': 'exact'}, {'field': '身高', 'value': 400, 'type': 'close'}],
+    [],
+])
+def test_edge_conditions_agree(frame_backend, sqlite_backend, assert_same_result, conditions):
+    assert_same_result(frame_backend.search(conditions), sqlite_backend.search(conditions))
+
+
+def test_text_match_falls_back_to_regexp(frame_backend, sqlite_backend, assert_same_result, monkeypatch):
+    conditions = [{'field': '姓名', 'value': '斯', 'type': 'contain'}]
+    sql, params = sqlite_backend._text_match('姓名', '斯')
+    assert sql.startswith('"姓名" IN (')
+
+    monkeypatch.setattr(storage, 'MAX_IN_VALUES', 1)
+    sql, params = sqlite_backend._text_match('姓名', '斯')
+    assert sql == '"姓名" REGEXP ?' and params == ['斯']
+    assert_same_result(frame_backend.search(conditions), sqlite_backend.search(conditions))
+
+
+def test_translate_uses_indexable_predicates(sqlite_backend):
+    assert sqlite_backend.translate({'field': '身高', 'value': 180, 'type': 'close'})[:2] == (
+        '"身高" BETWEEN ? AND ?', [175, 185])
+    assert sqlite_backend.translate({'field': '国籍', 'value': '巴西', 'type': 'exact'})[:2] == (
+        '"国籍" = ?', ['巴西'])
+    assert sqlite_backend.translate({'field': '国籍', 'value': 180, 'type': 'greater'}) is None
+
+
+@pytest.mark.parametrize("rows", [[700, 3, 500, 1], [5, 5, 0], [], list(range(768, -1, -1))])
+def test_take_keeps_requested_order(frame_backend, sqlite_backend, rows):
+    taken = sqlite_backend.take(rows)
+    assert list(taken.index) == rows
+    # 全为空值的文本列读回时类型推断不同，只比较取值
+    pd.testing.assert_frame_equal(taken, frame_backend.take(rows), check_dtype=False, check_index_type=False)
+
+
+def test_reopen_skips_import(excel_file, sqlite_backend, monkeypatch):
+    def fail():
+        raise AssertionError("数据库已是最新，不应重新导入")
+
+    monkeypatch.setattr(SQLiteBackend, 'import_excel', lambda self: fail())
+    reopened = SQLiteBackend(excel_file, sqlite_backend.db_file)
+    try:
+        assert reopened.data_version == sqlite_backend.data_version
+        assert len(reopened) == len(sqlite_backend)
+    finally:
+        reopened.close()